@@ -10,11 +10,11 @@ assert a1.verify(signature, m)
 """
 from __future__ import annotations
 
-import base58
 from ecdsa import SECP256k1, SigningKey
 from ecdsa.keys import BadSignatureError
 from ecdsa.util import sigencode_der, sigdecode_der
 
+from codec import encode_address
 from utils import ripemd160_sha256
 
 
@@ -25,18 +25,20 @@ class Account:
         encoding: 公钥格式，压缩/非压缩
         signing_key: 公钥
         verifying_key: 私钥
+        pubkey_hash: 公钥哈希，与公钥格式有关
         address: 账户地址，与公钥格式有关
         public_key: 公钥的字符串形式
         private_key: 私钥的字符串形式
     """
+    __slots__ = ('encoding', 'signing_key', 'verifying_key', 'pubkey_hash', 'address')
 
     def __init__(self, signing_key, public_key_encoding) -> None:
         self.encoding = public_key_encoding
         self.signing_key = signing_key
         self.verifying_key = self.signing_key.verifying_key
-        # base58库提供的base58check编码没有添加version前缀，需自行添加0x00
-        self.address = base58.b58encode_check(b'\x00' + ripemd160_sha256(
-            self.verifying_key.to_string(encoding=public_key_encoding))).decode()
+        self.pubkey_hash = ripemd160_sha256(
+            self.verifying_key.to_string(encoding=public_key_encoding))
+        self.address = encode_address(self.pubkey_hash)
 
     @classmethod
     def from_private_key(cls, private_key: str | bytes, public_key_encoding='uncompressed') -> Account:
@@ -11,11 +11,13 @@ print(block.to_dict())
 from __future__ import annotations
 
 import struct
+from concurrent.futures import Executor
 from typing import Dict, List
 
-from merkletree import MerkleTree
+from codec import NULL_HASH, hash2bytes, hash2hex
+from merkletree import merkle_root
 from transaction import Transaction
-from utils import deser_compact_size, double_sha256, int2hex, ser_compact_size
+from utils import deser_compact_size, double_sha256, double_sha256_many, ser_compact_size
 
 
 class BlockHeader:
@@ -23,20 +25,19 @@ class BlockHeader:
 
     属性：
         version
-        prev_block_hash
-        merkle_root
+        prev_block_hash: 小端存放的32字节
+        merkle_root: 小端存放的32字节
         timestamp
         target
         nonce
         hash: 区块头部哈希值
     """
+    __slots__ = ('version', 'prev_block_hash', 'merkle_root', 'timestamp', 'target', 'nonce')
 
-    def __init__(self, version: int, prev_block_hash: int | str, merkle_root: int, timestamp: int, target: int, nonce: int) -> None:
+    def __init__(self, version: int, prev_block_hash: int | str | bytes, merkle_root: int | str | bytes | None, timestamp: int, target: int, nonce: int) -> None:
         self.version = version
-        if isinstance(prev_block_hash, str):
-            prev_block_hash = int(prev_block_hash, 16)
-        self.prev_block_hash = prev_block_hash
-        self.merkle_root = merkle_root
+        self.prev_block_hash = hash2bytes(prev_block_hash)
+        self.merkle_root = hash2bytes(merkle_root)
         self.timestamp = timestamp
         self.target = target
         self.nonce = nonce
@@ -44,16 +45,8 @@ class BlockHeader:
     def serialize(self) -> bytes:
         ret = b""
         ret += struct.pack("<i", self.version)
-        tmp = self.prev_block_hash
-        # 小端存放
-        for _ in range(8):
-            ret += struct.pack("<I", tmp & 0xFFFFFFFF)
-            tmp >>= 32
-        tmp = self.merkle_root
-        # 小端存放
-        for _ in range(8):
-            ret += struct.pack("<I", tmp & 0xFFFFFFFF)
-            tmp >>= 32
+        ret += self.prev_block_hash
+        ret += self.merkle_root
         ret += struct.pack("<I", self.timestamp)
         ret += struct.pack("<I", self.target)
         ret += struct.pack("<I", self.nonce)
@@ -62,14 +55,8 @@ class BlockHeader:
     @classmethod
     def deserialize(cls, f) -> BlockHeader:
         version = struct.unpack("<i", f.read(4))[0]
-        prev_block_hash = 0
-        for i in range(8):
-            t = struct.unpack("<I", f.read(4))[0]
-            prev_block_hash += t << (i * 32)
-        merkle_root = 0
-        for i in range(8):
-            t = struct.unpack("<I", f.read(4))[0]
-            merkle_root += t << (i * 32)
+        prev_block_hash = f.read(32)
+        merkle_root = f.read(32)
         timestamp = struct.unpack("<I", f.read(4))[0]
         target = struct.unpack("<I", f.read(4))[0]
         nonce = struct.unpack("<I", f.read(4))[0]
@@ -77,14 +64,14 @@ class BlockHeader:
 
     @property
     def hash(self) -> str:
-        return double_sha256(self.serialize())[::-1].hex()
+        return hash2hex(double_sha256(self.serialize()))
 
     def to_dict(self) -> Dict:
         return {
             'version': self.version,
             'hash': self.hash,
-            'previous block hash': int2hex(self.prev_block_hash, 64),
-            'merkle root': int2hex(self.merkle_root, 64),
+            'previous block hash': hash2hex(self.prev_block_hash),
+            'merkle root': hash2hex(self.merkle_root),
             'target': self.target,
             'timestamp': self.timestamp,
             'nonce': self.nonce,
@@ -96,25 +83,36 @@ class Block:
 
     属性：
         header
-        txs: 区块包含的所有交易
+        txs: 区块包含的所有交易，创建区块后不应再修改
+
+    每笔交易只序列化一次，结果缓存后用于计算merkle根、序列化区块和txid。
+    传入executor时，交易数量较多的区块会用多个进程计算merkle树的底层，见merkle_root
     """
+    __slots__ = ('header', 'txs', '_raw_txs')
 
-    def __init__(self, header: BlockHeader, txs: List[Transaction]) -> None:
+    def __init__(self, header: BlockHeader, txs: List[Transaction], executor: Executor = None) -> None:
         self.header = header
         self.txs = txs
-        if not self.header.merkle_root:
-            self.header.merkle_root = self.__cal_merkle_root()
+        self._raw_txs = None
+        if self.header.merkle_root == NULL_HASH:
+            self.header.merkle_root = self.__cal_merkle_root(executor)
+
+    @property
+    def raw_txs(self) -> List[bytes]:
+        """各笔交易的序列化结果"""
+        if self._raw_txs is None:
+            self._raw_txs = [tx.serialize() for tx in self.txs]
+        return self._raw_txs
 
-    def __cal_merkle_root(self) -> int:
-        return int.from_bytes(MerkleTree.make_merkle_tree([tx.serialize() for tx in self.txs]).root.hash, 'little')
+    def __cal_merkle_root(self, executor: Executor = None) -> bytes:
+        return merkle_root(self.raw_txs, executor)
 
     def serialize(self) -> bytes:
-        ret = b''
-        ret += self.header.serialize()
-        ret += ser_compact_size(len(self.txs))
-        for i in self.txs:
-            ret += i.serialize()
-        return ret
+        return b''.join([
+            self.header.serialize(),
+            ser_compact_size(len(self.txs)),
+            *self.raw_txs
+        ])
 
     @classmethod
     def deserialize(cls, f) -> Block:
@@ -131,5 +129,6 @@ class Block:
     def to_dict(self) -> Dict:
         return {
             **self.header.to_dict(),
-            'tx': [tx.to_dict() for tx in self.txs]
+            'tx': [tx.to_dict(hash2hex(txid))
+                   for tx, txid in zip(self.txs, double_sha256_many(self.raw_txs))]
         }
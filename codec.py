@@ -0,0 +1,113 @@
+"""base58check与16进制编解码
+
+比特币地址的base58check编解码以及哈希值到16进制字符串的定长转换，
+提供单个和批量两种接口。
+
+使用样例：
+
+addrs = encode_addresses([bytes.fromhex('f5f2d624cfb5c3f66d06123d0829d1c9cebf770e')])
+assert decode_addresses(addrs)[0].hex() == 'f5f2d624cfb5c3f66d06123d0829d1c9cebf770e'
+print(hash2hex(double_sha256(b'hello bitcoin')))
+"""
+from __future__ import annotations
+
+from typing import Iterable, List
+
+from utils import double_sha256
+
+B58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+# 一次除以58^10，减少大整数运算的次数；余数再查表拆成两个字符一组
+_B58_CHUNK = 58 ** 10
+_B58_PAIRS = [a + b for a in B58_ALPHABET for b in B58_ALPHABET]
+_B58_INDEX = {c: i for i, c in enumerate(B58_ALPHABET)}
+# P2PKH地址的版本前缀
+P2PKH_VERSION = b'\x00'
+NULL_HASH = bytes(32)
+
+
+def b58encode(data: bytes) -> str:
+    """base58编码"""
+    n = int.from_bytes(data, 'big')
+    chunks = []
+    while n:
+        n, r = divmod(n, _B58_CHUNK)
+        for _ in range(5):
+            r, pair = divmod(r, 3364)
+            chunks.append(_B58_PAIRS[pair])
+    ret = ''.join(reversed(chunks)).lstrip('1')
+    # 每个前导0x00字节对应一个'1'
+    n_pad = len(data) - len(data.lstrip(b'\x00'))
+    return '1' * n_pad + ret
+
+
+def b58decode(s: str) -> bytes:
+    """base58解码"""
+    n = 0
+    try:
+        for c in s:
+            n = n * 58 + _B58_INDEX[c]
+    except KeyError as e:
+        raise ValueError(f'非法的base58字符：{e.args[0]!r}') from None
+    n_pad = len(s) - len(s.lstrip('1'))
+    return b'\x00' * n_pad + n.to_bytes((n.bit_length() + 7) // 8, 'big')
+
+
+def b58encode_check(payload: bytes) -> str:
+    """base58check编码，payload需自带版本前缀"""
+    return b58encode(payload + double_sha256(payload)[:4])
+
+
+def b58decode_check(s: str) -> bytes:
+    """base58check解码，返回带版本前缀的payload"""
+    raw = b58decode(s)
+    payload, checksum = raw[:-4], raw[-4:]
+    if len(checksum) < 4 or double_sha256(payload)[:4] != checksum:
+        raise ValueError(f'base58check校验失败：{s}')
+    return payload
+
+
+def encode_address(hash160: bytes, version: bytes = P2PKH_VERSION) -> str:
+    """由公钥哈希生成地址"""
+    return b58encode_check(version + hash160)
+
+
+def decode_address(address: str) -> bytes:
+    """由地址得到公钥哈希，去除开头的版本前缀"""
+    return b58decode_check(address)[1:]
+
+
+def encode_addresses(hash160s: Iterable[bytes], version: bytes = P2PKH_VERSION) -> List[str]:
+    """批量由公钥哈希生成地址"""
+    return [b58encode_check(version + h) for h in hash160s]
+
+
+def decode_addresses(addresses: Iterable[str]) -> List[bytes]:
+    """批量由地址得到公钥哈希"""
+    return [b58decode_check(a)[1:] for a in addresses]
+
+
+def hash2hex(h: bytes) -> str:
+    """将小端存放的32字节哈希值转成大端显示的16进制字符串"""
+    return h[::-1].hex()
+
+
+def hash2bytes(x: int | str | bytes | None) -> bytes:
+    """将哈希值转成小端存放的32字节
+
+    整数按数值转换，16进制字符串按大端显示的格式解析，bytes视为已经是小端存放，
+    None视为全0
+    """
+    if x is None:
+        return NULL_HASH
+    if isinstance(x, str):
+        x = int(x, 16)
+    if isinstance(x, int):
+        try:
+            return x.to_bytes(32, 'little')
+        except OverflowError:
+            raise ValueError('哈希值应在256位以内') from None
+    if not isinstance(x, bytes):
+        raise TypeError('哈希值应为整数、16进制字符串或bytes')
+    if len(x) != 32:
+        raise ValueError('bytes形式的哈希值应为32字节')
+    return x
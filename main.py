@@ -1,11 +1,15 @@
-import json
 import os
 import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 
 import click
 
 from account import Account
 from block import Block, BlockHeader
+from merkletree import PARALLEL_THRESHOLD
+from output import (append_blocks, is_sharded, load_accounts, load_tip,
+                    recover_blocks, write_plain, write_sharded)
 from transaction import Transaction
 
 
@@ -14,14 +18,37 @@ from transaction import Transaction
 @click.option('-t', '--transaction', default=1000, show_default=True, help='生成交易的数量')
 @click.option('-b', '--block', default=10, show_default=True, help='生成区块的数量')
 @click.option('-o', '--output', type=click.Path(), default=os.getcwd(), show_default=True, help='结果输出路径')
-def cli(account, transaction, block, output):
-    assert account > 1
+@click.option('-s', '--shards', default=0, show_default=True, help='分片输出的文件数量，为0时不分片')
+@click.option('-r', '--resume', '--append', is_flag=True, help='沿用输出路径中已有的账户，在已有区块之后续写')
+def cli(account, transaction, block, output, shards, resume):
     assert block > 0
     assert transaction >= block
-    # 随机生成account个随机公钥编码格式的Account
-    public_key_encoding = ('compressed', 'uncompressed')
-    accounts = [Account.from_random_key(
-        public_key_encoding[random.randint(0, 1)]) for _ in range(account)]
+    assert shards >= 0
+    if resume:
+        ctx = click.get_current_context()
+        if ctx.get_parameter_source('account') != click.core.ParameterSource.DEFAULT:
+            raise click.UsageError('续写时沿用已有账户，不能指定-a/--account')
+        try:
+            sharded = is_sharded(output)
+            if shards and not sharded:
+                raise click.UsageError('已有输出没有分片，续写时不能指定-s/--shards')
+            if not sharded:
+                recover_blocks(output)
+            # 续写时沿用已有账户，只读取最后一个区块的hash
+            accounts = [Account.from_private_key(
+                v['private key'], 'compressed' if len(v['public key']) == 66 else 'uncompressed'
+            ) for v in load_accounts(output).values()]
+            prev_hash, _ = load_tip(output)
+        except (FileNotFoundError, ValueError) as e:
+            raise click.UsageError(f'无法续写{output}中的输出：{e}')
+        account = len(accounts)
+    else:
+        # 随机生成account个随机公钥编码格式的Account
+        public_key_encoding = ('compressed', 'uncompressed')
+        accounts = [Account.from_random_key(
+            public_key_encoding[random.randint(0, 1)]) for _ in range(account)]
+        prev_hash = 0
+    assert account > 1
     # 根据上面生成的账户随机生成transaction个Transaction
     txs = []
     for _ in range(transaction):
@@ -35,24 +62,25 @@ def cli(account, transaction, block, output):
         ))
     # 将上述交易平均分配到随机生成的block个区块
     tx_per_block = transaction // block
-    prev_hash = 0
     blocks = []
-    for i in range(0, transaction, tx_per_block):
-        bhdr = BlockHeader(
-            version=1,
-            prev_block_hash=prev_hash,
-            merkle_root=None,
-            timestamp=0,
-            target=0,
-            nonce=0
-        )
-        blocks.append(Block(bhdr, txs[i:i+tx_per_block]))
-        prev_hash = blocks[-1].header.hash
+    # 区块足够大时，所有区块共用一组进程计算merkle树的底层
+    with (ProcessPoolExecutor() if tx_per_block >= PARALLEL_THRESHOLD else nullcontext()) as executor:
+        for i in range(0, transaction, tx_per_block):
+            bhdr = BlockHeader(
+                version=1,
+                prev_block_hash=prev_hash,
+                merkle_root=None,
+                timestamp=0,
+                target=0,
+                nonce=0
+            )
+            blocks.append(Block(bhdr, txs[i:i+tx_per_block], executor))
+            prev_hash = blocks[-1].header.hash
     # 将生成结果以json格式输出到文件中
-    with open(os.path.join(output, 'blocks.json'), 'w', encoding='utf-8') as f:
-        json.dump({b.header.hash: b.to_dict() for b in blocks}, f, indent=4)
-    with open(os.path.join(output, 'accounts.json'), 'w', encoding='utf-8') as f:
-        json.dump({a.address: {
-            'private key': a.private_key,
-            'public key': a.public_key
-        } for a in accounts}, f, indent=4)
+    if resume:
+        append_blocks(blocks, output, shards or 1)
+        return
+    if shards:
+        write_sharded(blocks, accounts, output, shards)
+    else:
+        write_plain(blocks, accounts, output)
@@ -3,11 +3,21 @@
 使用样例：
 
 merkle_tree = MerkleTree.make_merkle_tree(['big', 'brother', 'is', 'watching', 'you'])
+root = merkle_root([b'big', b'brother', b'is', b'watching', b'you'])
+assert root == merkle_tree.root.hash
 """
 from __future__ import annotations
+
+import os
 from collections.abc import Iterable
+from concurrent.futures import Executor
+from itertools import repeat
+from typing import List
+
+from utils import double_sha256, double_sha256_many
 
-from utils import double_sha256
+# 传入executor时，叶子数量达到该值才交给多个进程分别计算底层的子树
+PARALLEL_THRESHOLD = 100000
 
 
 class MerkleNode:
@@ -18,6 +28,7 @@ class MerkleNode:
         left: 左子节点
         right: 右子节点
     """
+    __slots__ = ('hash', 'left', 'right')
 
     def __init__(self, data: str | bytes) -> None:
         if isinstance(data, str):
@@ -46,6 +57,7 @@ class MerkleTree:
     属性：
         root: 根节点
     """
+    __slots__ = ('root',)
 
     def __init__(self, data) -> None:
         if not isinstance(data, Iterable):
@@ -71,3 +83,50 @@ class MerkleTree:
     def make_merkle_tree(data) -> MerkleTree:
         """生成merkle树"""
         return MerkleTree(data)
+
+
+def _next_level(hashes: List[bytes]) -> List[bytes]:
+    """由一层节点的哈希值计算上一层，不修改传入的列表"""
+    # 如果是奇数个节点，重复最后一个节点
+    if len(hashes) % 2:
+        hashes = hashes + hashes[-1:]
+    return double_sha256_many([hashes[i] + hashes[i + 1] for i in range(0, len(hashes), 2)])
+
+
+def _root(hashes: List[bytes]) -> bytes:
+    """逐层合并，直到只剩一个节点"""
+    while len(hashes) > 1:
+        hashes = _next_level(hashes)
+    return hashes[0]
+
+
+def _subtree_root(data: List[bytes], n_levels: int) -> bytes:
+    """计算叶子数据的n_levels层子树的根"""
+    hashes = double_sha256_many(data)
+    for _ in range(n_levels):
+        hashes = _next_level(hashes)
+    return hashes[0]
+
+
+def merkle_root(data: List[bytes], executor: Executor = None, n_workers: int = None,
+                parallel_threshold: int = None) -> bytes:
+    """直接由叶子数据计算merkle根，不构建MerkleNode，结果与MerkleTree相同
+
+    默认在当前进程中计算。传入executor且叶子数量不小于parallel_threshold时，
+    将叶子按2^k个一组分成不超过n_workers组交给executor，各自计算k层子树的根，
+    再在当前进程中合并剩余的层。parallel_threshold默认为PARALLEL_THRESHOLD，
+    n_workers默认为executor的进程数。executor由调用方创建，可以在多个区块之间复用
+    """
+    if len(data) == 0:
+        raise ValueError('merkle树的叶子不能为空')
+    if parallel_threshold is None:
+        parallel_threshold = PARALLEL_THRESHOLD
+    # concurrent.futures的executor没有公开进程数，取不到时按CPU数量
+    n_workers = n_workers or getattr(executor, '_max_workers', None) or os.cpu_count() or 1
+    if executor is None or len(data) < parallel_threshold or n_workers == 1:
+        return _root(double_sha256_many(data))
+    # 最后一组可能不满，但仍合并k层（不足时重复最后一个节点），与整棵树的计算方式一致
+    n_levels = ((len(data) - 1) // n_workers).bit_length()
+    size = 1 << n_levels
+    chunks = [data[i:i + size] for i in range(0, len(data), size)]
+    return _root(list(executor.map(_subtree_root, chunks, repeat(n_levels))))
@@ -0,0 +1,319 @@
+"""生成结果的分片输出、读取与续写
+
+区块按高度区间、账户按地址区间切分成多个文件，由多个进程并发序列化写入，
+并生成记录各分片范围和校验和的manifest.json。读取时只打开需要的分片。
+续写时只读取最后一个区块的hash，新区块追加到已有输出中。
+
+使用样例：
+
+write_sharded(blocks, accounts, '../output', n_shards=4)
+blocks = load_blocks('../output', start=10, end=20)
+accounts = load_accounts('../output', ['15natoEM1kLXDrGDRbGV3xVP22MhJK18ML'])
+tip = load_tip('../output')
+append_blocks(new_blocks, '../output')
+
+两种输出方式互斥：写入其中一种时会删除另一种留下的文件。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+from account import Account
+from block import Block
+
+MANIFEST = 'manifest.json'
+BLOCKS = 'blocks.json'
+ACCOUNTS = 'accounts.json'
+# 原地追加blocks.json时记录追加前的文件大小，用于中断后恢复
+JOURNAL = 'blocks.json.journal'
+_SHARD_FILE = re.compile(r'(blocks|accounts)-\d{4}\.json')
+# indent=4输出时，顶层的区块hash所在行
+_TOP_KEY = re.compile(rb'\n {4}"([0-9a-f]{64})": \{\n')
+_CHUNK = 1 << 16
+
+
+def _split(n: int, n_shards: int) -> List[Tuple[int, int]]:
+    """将[0, n)尽量均匀地切分成不超过n_shards个区间"""
+    if n == 0:
+        return []
+    n_shards = max(1, min(n_shards, n))
+    bounds = [n * i // n_shards for i in range(n_shards + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(n_shards)]
+
+
+def _dump(path: str, obj: Dict) -> str:
+    """将obj以json格式写入path，返回文件内容的sha256"""
+    data = json.dumps(obj, indent=4).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_blocks(path: str, blocks: List[Block]) -> str:
+    return _dump(path, {b.header.hash: b.to_dict() for b in blocks})
+
+
+def _write_accounts(path: str, accounts: List[Tuple[str, str, str]]) -> str:
+    return _dump(path, {addr: {
+        'private key': prik,
+        'public key': pubk
+    } for addr, prik, pubk in accounts})
+
+
+def _submit_blocks(executor, blocks: List[Block], output: str, n_shards: int, height: int = 0, index: int = 0) -> List[Tuple[Dict, object]]:
+    """提交区块分片的写入任务，height和index分别为起始高度和起始分片编号"""
+    ret = []
+    for i, (start, end) in enumerate(_split(len(blocks), n_shards), index):
+        shard = {
+            'file': f'blocks-{i:04}.json',
+            'start': height + start,
+            'end': height + end,
+        }
+        ret.append((shard, executor.submit(
+            _write_blocks, os.path.join(output, shard['file']), blocks[start:end])))
+    return ret
+
+
+def _collect(submitted: List[Tuple[Dict, object]]) -> List[Dict]:
+    return [{**shard, 'sha256': fut.result()} for shard, fut in submitted]
+
+
+def _replace(path: str, data: bytes) -> None:
+    """先写入临时文件再替换，避免中断时留下不完整的文件"""
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _save_manifest(output: str, manifest: Dict) -> None:
+    _replace(os.path.join(output, MANIFEST), json.dumps(manifest, indent=4).encode('utf-8'))
+
+
+def _remove(output: str, names: Iterable[str]) -> None:
+    for name in names:
+        try:
+            os.remove(os.path.join(output, name))
+        except FileNotFoundError:
+            pass
+
+
+def _shard_files(output: str) -> List[str]:
+    return [name for name in os.listdir(output) if _SHARD_FILE.fullmatch(name)]
+
+
+def write_plain(blocks: List[Block], accounts: List[Account], output: str) -> None:
+    """不分片，将区块和账户分别写入blocks.json和accounts.json，并删除分片输出留下的文件"""
+    _remove(output, [JOURNAL])
+    with open(os.path.join(output, BLOCKS), 'w', encoding='utf-8') as f:
+        json.dump({b.header.hash: b.to_dict() for b in blocks}, f, indent=4)
+    with open(os.path.join(output, ACCOUNTS), 'w', encoding='utf-8') as f:
+        json.dump({a.address: {
+            'private key': a.private_key,
+            'public key': a.public_key
+        } for a in accounts}, f, indent=4)
+    _remove(output, [MANIFEST] + _shard_files(output))
+
+
+def write_sharded(blocks: List[Block], accounts: List[Account], output: str, n_shards: int) -> Dict:
+    """分片并发写入区块和账户，返回manifest内容
+
+    区块按高度（即在blocks中的下标）切分，账户按地址排序后切分。
+    写完manifest后删除未分片输出的文件，以及之前分片数更多时留下的分片
+    """
+    # Account中的密钥对象序列化代价较高，只把字符串传给子进程
+    account_rows = sorted((a.address, a.private_key, a.public_key) for a in accounts)
+    account_ranges = _split(len(account_rows), n_shards)
+    with ProcessPoolExecutor(max_workers=min(n_shards, os.cpu_count() or 1)) as executor:
+        block_submitted = _submit_blocks(executor, blocks, output, n_shards)
+        account_futures = [executor.submit(
+            _write_accounts,
+            os.path.join(output, f'accounts-{i:04}.json'),
+            account_rows[start:end]
+        ) for i, (start, end) in enumerate(account_ranges)]
+        manifest = {
+            'blocks': _collect(block_submitted),
+            'accounts': [{
+                'file': f'accounts-{i:04}.json',
+                'first': account_rows[start][0],
+                'last': account_rows[end - 1][0],
+                'sha256': fut.result()
+            } for i, ((start, end), fut) in enumerate(zip(account_ranges, account_futures))],
+        }
+    _save_manifest(output, manifest)
+    used = {shard['file'] for shard in manifest['blocks'] + manifest['accounts']}
+    _remove(output, [BLOCKS, ACCOUNTS, JOURNAL] + [
+        name for name in _shard_files(output) if name not in used])
+    return manifest
+
+
+def load_manifest(output: str) -> Dict:
+    with open(os.path.join(output, MANIFEST), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _load_shard(output: str, shard: Dict, verify: bool) -> Dict:
+    with open(os.path.join(output, shard['file']), 'rb') as f:
+        data = f.read()
+    if verify and hashlib.sha256(data).hexdigest() != shard['sha256']:
+        raise ValueError(f'分片校验失败：{shard["file"]}')
+    return json.loads(data)
+
+
+def is_sharded(output: str) -> bool:
+    """判断输出是否分片，两种输出的文件同时存在时报错"""
+    sharded = os.path.exists(os.path.join(output, MANIFEST))
+    if sharded and os.path.exists(os.path.join(output, BLOCKS)):
+        raise ValueError(f'{output}中同时存在{MANIFEST}和{BLOCKS}，无法确定输出方式')
+    return sharded
+
+
+def recover_blocks(output: str) -> None:
+    """追加blocks.json的过程被中断时，恢复到追加之前的内容
+
+    如果追加已经完整写入，只是没来得及删除日志，则保留追加的内容。
+    只应在续写之前调用，不能与正在进行的追加同时运行
+    """
+    journal = os.path.join(output, JOURNAL)
+    if not os.path.exists(journal):
+        return
+    with open(journal, encoding='utf-8') as f:
+        record = json.load(f)
+    with open(os.path.join(output, BLOCKS), 'r+b') as f:
+        end = f.seek(0, os.SEEK_END)
+        f.seek(max(end - 2, 0))
+        if end != record['new size'] or f.read(2) != b'\n}':
+            # 追加时只覆盖了原来末尾的'\n}'，截断后重新闭合即可
+            f.seek(record['size'] - 2)
+            f.truncate()
+            f.write(b'\n}')
+            f.flush()
+            os.fsync(f.fileno())
+    os.remove(journal)
+
+
+def _check_journal(output: str) -> None:
+    if os.path.exists(os.path.join(output, JOURNAL)):
+        raise ValueError(f'{BLOCKS}有未完成的追加，需要先续写或调用recover_blocks恢复')
+
+
+def _in_range(blocks: Dict, height: int, start: int, end: int | None) -> Dict:
+    """从height开始编号，取出高度在[start, end)内的区块"""
+    return {k: v for h, (k, v) in enumerate(blocks.items(), height)
+            if h >= start and (end is None or h < end)}
+
+
+def load_blocks(output: str, start: int = 0, end: int = None, verify: bool = False) -> Dict:
+    """读取高度在[start, end)内的区块，只打开与该区间相交的分片
+
+    未分片输出时读取blocks.json，verify无效
+    """
+    if not is_sharded(output):
+        _check_journal(output)
+        with open(os.path.join(output, BLOCKS), encoding='utf-8') as f:
+            return _in_range(json.load(f), 0, start, end)
+    ret = {}
+    for shard in load_manifest(output)['blocks']:
+        if shard['end'] <= start or (end is not None and shard['start'] >= end):
+            continue
+        ret.update(_in_range(_load_shard(output, shard, verify), shard['start'], start, end))
+    return ret
+
+
+def load_accounts(output: str, addresses: Iterable[str] = None, verify: bool = False) -> Dict:
+    """读取给定地址的账户，addresses为None时读取全部账户，只打开包含这些地址的分片
+
+    未分片输出时读取accounts.json，verify无效
+    """
+    if not is_sharded(output):
+        with open(os.path.join(output, ACCOUNTS), encoding='utf-8') as f:
+            accounts = json.load(f)
+        if addresses is None:
+            return accounts
+        return {a: accounts[a] for a in addresses if a in accounts}
+    shards = load_manifest(output)['accounts']
+    if addresses is None:
+        ret = {}
+        for shard in shards:
+            ret.update(_load_shard(output, shard, verify))
+        return ret
+    ret = {}
+    addresses = set(addresses)
+    for shard in shards:
+        wanted = [a for a in addresses if shard['first'] <= a <= shard['last']]
+        if not wanted:
+            continue
+        accounts = _load_shard(output, shard, verify)
+        ret.update({a: accounts[a] for a in wanted if a in accounts})
+    return ret
+
+
+def _last_key(path: str) -> str:
+    """从文件末尾向前查找最后一个区块的hash，无需解析整个文件"""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        tail = b''
+        while pos > 0:
+            step = min(_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            # 保留上一段开头的部分内容，防止匹配行被截断
+            tail = f.read(step) + tail[:100]
+            matches = _TOP_KEY.findall(tail)
+            if matches:
+                return matches[-1].decode()
+    raise ValueError(f'{path}中没有区块')
+
+
+def load_tip(output: str) -> Tuple[str, int | None]:
+    """读取最后一个区块的hash以及区块数量，未分片输出时区块数量为None"""
+    if not is_sharded(output):
+        _check_journal(output)
+        return _last_key(os.path.join(output, BLOCKS)), None
+    shards = load_manifest(output)['blocks']
+    if not shards:
+        raise ValueError(f'{output}中没有区块')
+    return _last_key(os.path.join(output, shards[-1]['file'])), shards[-1]['end']
+
+
+def append_blocks(blocks: List[Block], output: str, n_shards: int = 1) -> None:
+    """将新区块追加到已有输出中
+
+    分片输出时新区块写入新的分片，再替换manifest；否则原地追加到blocks.json末尾，
+    结果与一次性输出全部区块相同。追加前先记录追加前后的文件大小，中断后可由recover_blocks恢复
+    """
+    if not blocks:
+        return
+    if is_sharded(output):
+        manifest = load_manifest(output)
+        shards = manifest['blocks']
+        with ProcessPoolExecutor(max_workers=min(n_shards, os.cpu_count() or 1)) as executor:
+            shards += _collect(_submit_blocks(
+                executor, blocks, output, n_shards,
+                height=shards[-1]['end'] if shards else 0, index=len(shards)))
+        _save_manifest(output, manifest)
+        return
+    recover_blocks(output)
+    body = json.dumps({b.header.hash: b.to_dict() for b in blocks}, indent=4)
+    tail = b',\n' + body[2:-2].encode('utf-8') + b'\n}'
+    with open(os.path.join(output, BLOCKS), 'r+b') as f:
+        pos = f.seek(-2, os.SEEK_END)
+        if f.read(2) != b'\n}':
+            raise ValueError(f'{BLOCKS}格式不正确，无法追加')
+        _replace(os.path.join(output, JOURNAL), json.dumps({
+            'size': pos + 2,
+            'new size': pos + len(tail)
+        }).encode('utf-8'))
+        # 覆盖末尾的'\n}'，接上新区块后重新闭合
+        f.seek(pos)
+        f.write(tail)
+        f.flush()
+        os.fsync(f.fileno())
+    os.remove(os.path.join(output, JOURNAL))
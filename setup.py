@@ -6,8 +6,7 @@ setup(
     py_modules=['main'],
     install_requires=[
         'Click',
-        'ecdsa',
-        'base58'
+        'ecdsa'
     ],
     entry_points={
         'console_scripts': [
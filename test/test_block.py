@@ -1,10 +1,14 @@
 import random
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 
 import pytest
 import requests
 
-from block import Block
+import merkletree
+from account import Account
+from block import Block, BlockHeader
+from transaction import Transaction
 
 
 def get_raw_block(block_height):
@@ -35,3 +39,37 @@ def test_block(random_real_block):
     assert block.is_valid()
     for a, b in zip(block_json['tx'], block.txs):
         assert a['hash'] == b.txid
+
+
+class CountingExecutor(ProcessPoolExecutor):
+    """记录map调用次数，用于确认走了多进程的分支"""
+    n_map = 0
+
+    def map(self, *args, **kwargs):
+        self.n_map += 1
+        return super().map(*args, **kwargs)
+
+
+@pytest.fixture
+def mock_txs():
+    accounts = [Account.from_random_key() for _ in range(4)]
+    return [Transaction.generate(accounts[:1], accounts[1:]) for _ in range(9)]
+
+
+def test_block_executor(monkeypatch, mock_txs):
+    block = Block(BlockHeader(1, 0, None, 0, 0, 0), mock_txs)
+    monkeypatch.setattr(merkletree, 'PARALLEL_THRESHOLD', 4)
+    with CountingExecutor(max_workers=2) as executor:
+        parallel_block = Block(BlockHeader(1, 0, None, 0, 0, 0), mock_txs, executor)
+        assert executor.n_map == 1
+    assert parallel_block.header.merkle_root == block.header.merkle_root
+    assert parallel_block.is_valid()
+
+
+def test_block_serialize(mock_txs):
+    block = Block(BlockHeader(1, 0, None, 0, 0, 0), mock_txs)
+    block2 = Block.deserialize(BytesIO(block.serialize()))
+    assert block2.to_dict() == block.to_dict()
+    assert block2.is_valid()
+    for tx, tx_dict in zip(mock_txs, block.to_dict()['tx']):
+        assert tx_dict == tx.to_dict()
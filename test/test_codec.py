@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from account import Account
+from codec import (b58decode_check, b58encode_check, decode_addresses,
+                   encode_addresses, hash2bytes, hash2hex)
+from utils import double_sha256
+
+
+def test_address_vector():
+    """测试数据来自Mastering Bitcoin第二版第69页"""
+    h = bytes.fromhex('f5f2d624cfb5c3f66d06123d0829d1c9cebf770e')
+    assert encode_addresses([h]) == ['1PRTTaJesdNovgne6Ehcdu1fpEdX7913CK']
+    assert decode_addresses(['1PRTTaJesdNovgne6Ehcdu1fpEdX7913CK']) == [h]
+
+
+def test_addresses_roundtrip():
+    accounts = [Account.from_random_key(encoding)
+                for encoding in ('compressed', 'uncompressed') for _ in range(8)]
+    addrs = encode_addresses([a.pubkey_hash for a in accounts])
+    assert addrs == [a.address for a in accounts]
+    assert decode_addresses(addrs) == [a.pubkey_hash for a in accounts]
+
+
+def test_b58check_leading_zeros():
+    for n_zero in range(4):
+        payload = b'\x00' * n_zero + random.randbytes(20)
+        assert b58decode_check(b58encode_check(payload)) == payload
+    with pytest.raises(ValueError):
+        b58decode_check('1PRTTaJesdNovgne6Ehcdu1fpEdX7913CL')
+
+
+def test_hash_hex():
+    h = double_sha256(b'hello bitcoin')
+    assert hash2hex(h) == h[::-1].hex()
+    assert hash2bytes(hash2hex(h)) == h
+    assert hash2bytes(int.from_bytes(h, 'little')) == h
+    # 与原先的int(x, 16)一样，接受任意长度的16进制字符串
+    assert hash2bytes('ab') == hash2bytes(0xab) == b'\xab' + bytes(31)
+    assert hash2bytes('abc') == hash2bytes(0xabc)
+    with pytest.raises(ValueError):
+        hash2bytes('1' * 65)
+    with pytest.raises(ValueError):
+        hash2bytes(b'\xab')
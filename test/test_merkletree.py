@@ -1,6 +1,10 @@
 import random
-from merkletree import MerkleNode, MerkleTree
-from utils import double_sha256, random_str
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from merkletree import MerkleNode, MerkleTree, merkle_root
+from utils import double_sha256, double_sha256_many, random_str
 
 
 def test_merkletree():
@@ -10,6 +14,26 @@ def test_merkletree():
     assert verify_merklenode(tree.root)
 
 
+def test_merkle_root():
+    rs = random_str()
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        for n in (1, 2, 3, 7, 8, 9, random.randint(10, 129)):
+            mock_txs = [next(rs).encode() for _ in range(n)]
+            copy = list(mock_txs)
+            root = MerkleTree.make_merkle_tree(mock_txs).root.hash
+            assert merkle_root(mock_txs) == root
+            # 降低阈值以测试多进程计算子树的情况，executor在多次调用间复用
+            assert merkle_root(mock_txs, executor, n_workers=4, parallel_threshold=1) == root
+            assert mock_txs == copy
+    with pytest.raises(ValueError):
+        merkle_root([])
+
+
+def test_double_sha256_many():
+    data = [b'', b'big', b'brother']
+    assert double_sha256_many(data) == [double_sha256(x) for x in data]
+
+
 def verify_merklenode(root: MerkleNode) -> bool:
     if root.left is None or root.right is None:
         if root.left is None and root.right is None:
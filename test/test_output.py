@@ -0,0 +1,159 @@
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from account import Account
+from block import Block, BlockHeader
+from main import cli
+from output import (JOURNAL, append_blocks, load_accounts, load_blocks,
+                    load_manifest, load_tip, recover_blocks, write_plain,
+                    write_sharded)
+from transaction import Transaction
+
+
+@pytest.fixture
+def mock_chain():
+    accounts = [Account.from_random_key() for _ in range(7)]
+    blocks = []
+    prev_hash = 0
+    for _ in range(5):
+        txs = [Transaction.generate(accounts[:1], accounts[1:3])]
+        blocks.append(Block(BlockHeader(1, prev_hash, None, 0, 0, 0), txs))
+        prev_hash = blocks[-1].header.hash
+    return blocks, accounts
+
+
+def test_write_sharded(tmp_path, mock_chain):
+    blocks, accounts = mock_chain
+    manifest = write_sharded(blocks, accounts, tmp_path, 3)
+    assert manifest == load_manifest(tmp_path)
+    assert [(s['start'], s['end']) for s in manifest['blocks']] == [(0, 1), (1, 3), (3, 5)]
+    assert load_blocks(tmp_path, verify=True) == {b.header.hash: b.to_dict() for b in blocks}
+    assert load_accounts(tmp_path, verify=True) == {a.address: {
+        'private key': a.private_key,
+        'public key': a.public_key
+    } for a in accounts}
+
+
+def test_load_needed_shards(tmp_path, mock_chain):
+    blocks, accounts = mock_chain
+    manifest = write_sharded(blocks, accounts, tmp_path, 3)
+    # 删除不需要的分片后仍能读取
+    os.remove(tmp_path / manifest['blocks'][0]['file'])
+    assert list(load_blocks(tmp_path, 2, 4)) == [b.header.hash for b in blocks[2:4]]
+    first = min(a.address for a in accounts)
+    for shard in manifest['accounts'][1:]:
+        os.remove(tmp_path / shard['file'])
+    assert list(load_accounts(tmp_path, [first])) == [first]
+
+
+def test_append_blocks(tmp_path, mock_chain):
+    blocks, _ = mock_chain
+    with open(tmp_path / 'blocks.json', 'w', encoding='utf-8') as f:
+        json.dump({b.header.hash: b.to_dict() for b in blocks[:2]}, f, indent=4)
+    assert load_tip(tmp_path) == (blocks[1].header.hash, None)
+    append_blocks(blocks[2:], tmp_path)
+    assert load_tip(tmp_path) == (blocks[-1].header.hash, None)
+    assert list(load_blocks(tmp_path, 1, 3)) == [b.header.hash for b in blocks[1:3]]
+    with open(tmp_path / 'blocks.json', encoding='utf-8') as f:
+        assert f.read() == json.dumps({b.header.hash: b.to_dict() for b in blocks}, indent=4)
+
+
+def test_append_sharded(tmp_path, mock_chain):
+    blocks, accounts = mock_chain
+    write_sharded(blocks[:2], accounts, tmp_path, 2)
+    assert load_tip(tmp_path) == (blocks[1].header.hash, 2)
+    append_blocks(blocks[2:], tmp_path, 2)
+    assert load_tip(tmp_path) == (blocks[-1].header.hash, 5)
+    assert [(s['start'], s['end']) for s in load_manifest(tmp_path)['blocks']] == [(0, 1), (1, 2), (2, 3), (3, 5)]
+    assert load_blocks(tmp_path, verify=True) == {b.header.hash: b.to_dict() for b in blocks}
+
+
+def test_output_modes_exclusive(tmp_path, mock_chain):
+    blocks, accounts = mock_chain
+    write_sharded(blocks, accounts, tmp_path, 3)
+    write_sharded(blocks[:2], accounts, tmp_path, 2)
+    # 分片数减少后，多余的旧分片被删除
+    assert sorted(os.listdir(tmp_path)) == [
+        'accounts-0000.json', 'accounts-0001.json',
+        'blocks-0000.json', 'blocks-0001.json', 'manifest.json']
+    write_plain(blocks, accounts, tmp_path)
+    assert sorted(os.listdir(tmp_path)) == ['accounts.json', 'blocks.json']
+    assert load_tip(tmp_path) == (blocks[-1].header.hash, None)
+    write_sharded(blocks, accounts, tmp_path, 2)
+    assert 'blocks.json' not in os.listdir(tmp_path)
+    assert load_tip(tmp_path) == (blocks[-1].header.hash, 5)
+
+
+def test_mixed_output_rejected(tmp_path, mock_chain):
+    blocks, accounts = mock_chain
+    write_sharded(blocks[:2], accounts, tmp_path, 2)
+    with open(tmp_path / 'blocks.json', 'w', encoding='utf-8') as f:
+        json.dump({b.header.hash: b.to_dict() for b in blocks}, f, indent=4)
+    with pytest.raises(ValueError):
+        load_tip(tmp_path)
+    with pytest.raises(ValueError):
+        append_blocks(blocks[2:], tmp_path)
+    result = CliRunner().invoke(cli, ['-t', '1', '-b', '1', '-o', str(tmp_path), '-r'])
+    assert result.exit_code != 0
+    assert 'manifest.json' in result.output
+
+
+def test_append_interrupted(tmp_path, mock_chain):
+    blocks, _ = mock_chain
+    with open(tmp_path / 'blocks.json', 'w', encoding='utf-8') as f:
+        json.dump({b.header.hash: b.to_dict() for b in blocks[:2]}, f, indent=4)
+    size = os.path.getsize(tmp_path / 'blocks.json')
+    # 模拟追加到一半时中断
+    with open(tmp_path / JOURNAL, 'w', encoding='utf-8') as f:
+        json.dump({'size': size, 'new size': size + 1000}, f)
+    with open(tmp_path / 'blocks.json', 'r+b') as f:
+        f.seek(size - 2)
+        f.write(b',\n    "')
+    # 只读的方法不做恢复，发现未完成的追加时报错
+    with pytest.raises(ValueError):
+        load_tip(tmp_path)
+    with pytest.raises(ValueError):
+        load_blocks(tmp_path)
+    recover_blocks(tmp_path)
+    assert not os.path.exists(tmp_path / JOURNAL)
+    assert load_tip(tmp_path) == (blocks[1].header.hash, None)
+    append_blocks(blocks[2:], tmp_path)
+    with open(tmp_path / 'blocks.json', encoding='utf-8') as f:
+        assert f.read() == json.dumps({b.header.hash: b.to_dict() for b in blocks}, indent=4)
+
+
+def test_append_finished_before_journal_removed(tmp_path, mock_chain):
+    blocks, _ = mock_chain
+    with open(tmp_path / 'blocks.json', 'w', encoding='utf-8') as f:
+        json.dump({b.header.hash: b.to_dict() for b in blocks[:2]}, f, indent=4)
+    size = os.path.getsize(tmp_path / 'blocks.json')
+    append_blocks(blocks[2:], tmp_path)
+    # 模拟追加已经写完，但删除日志前中断
+    with open(tmp_path / JOURNAL, 'w', encoding='utf-8') as f:
+        json.dump({'size': size, 'new size': os.path.getsize(tmp_path / 'blocks.json')}, f)
+    recover_blocks(tmp_path)
+    assert load_tip(tmp_path) == (blocks[-1].header.hash, None)
+
+
+def test_resume_missing_output(tmp_path, mock_chain):
+    runner = CliRunner()
+    result = runner.invoke(cli, ['-t', '1', '-b', '1', '-o', str(tmp_path), '-r'])
+    assert result.exit_code == 2 and '无法续写' in result.output
+    blocks, accounts = mock_chain
+    write_sharded([], accounts, tmp_path, 2)
+    result = runner.invoke(cli, ['-t', '1', '-b', '1', '-o', str(tmp_path), '-r'])
+    assert result.exit_code == 2 and '没有区块' in result.output
+
+
+def test_resume_options(tmp_path):
+    runner = CliRunner()
+    assert runner.invoke(cli, ['-a', '4', '-t', '2', '-b', '1', '-o', str(tmp_path)]).exit_code == 0
+    result = runner.invoke(cli, ['-a', '4', '-t', '2', '-b', '1', '-o', str(tmp_path), '-r'])
+    assert result.exit_code != 0 and '--account' in result.output
+    result = runner.invoke(cli, ['-s', '2', '-t', '2', '-b', '1', '-o', str(tmp_path), '-r'])
+    assert result.exit_code != 0 and '--shards' in result.output
+    assert runner.invoke(cli, ['-t', '2', '-b', '1', '-o', str(tmp_path), '-r']).exit_code == 0
+    assert len(load_blocks(tmp_path)) == 2
@@ -1,3 +1,6 @@
+import os
+import random
+import tracemalloc
 from io import BytesIO
 
 import pytest
@@ -54,3 +57,30 @@ def test_transaction_deserialize(mock_tx_hex, mock_tx):
     assert Transaction.deserialize(
         BytesIO(bytes.fromhex(mock_tx_hex))
     ).to_dict() == mock_tx.to_dict()
+
+
+def test_transaction_txid_bytes(mock_tx):
+    txin = mock_tx.vin[0]
+    assert txin.txid == bytes.fromhex('7957a35fe64f80d234d76d83a2a8f1a0d8149a41d81de548f0a65a8a999f6f18')[::-1]
+    assert TxIn(txin.txid[::-1].hex(), 0, b'', 0).txid == txin.txid
+    assert TxIn(txin.txid, 0, b'', 0).txid == txin.txid
+
+
+def test_transaction_memory():
+    """1个输入、2个P2PKH输出的交易，每笔交易占用的内存应不超过880字节"""
+    n = 10000
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        txs = [Transaction(
+            1,
+            [TxIn(os.urandom(32), random.randint(0, 0xFFFFFFFF), os.urandom(107), 0xFFFFFFFF)],
+            [TxOut(random.randint(1, 0xFFFFFFFF), make_P2PKH_scriptPubKey(os.urandom(20)))
+             for _ in range(2)],
+            0
+        ) for _ in range(n)]
+        used = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    assert not hasattr(txs[0], '__dict__')
+    assert (used / n) < 880
@@ -14,9 +14,8 @@ import random
 import struct
 from typing import Dict, List
 
-from base58 import b58decode_check
-
 from account import Account
+from codec import hash2bytes, hash2hex
 from utils import deser_compact_size, double_sha256, int2hex, random_str, ser_compact_size
 
 
@@ -40,25 +39,22 @@ class TxIn:
     """交易输入
 
     属性：
-        txid: UTXO交易id
+        txid: UTXO交易id，小端存放的32字节
         vout: UTOX输出index
         scriptSig: bytes类型的脚本
         sequence
     """
+    __slots__ = ('txid', 'vout', 'scriptSig', 'sequence')
 
-    def __init__(self, txid: int, vout: int, scriptSig: bytes, sequence: int) -> None:
-        self.txid = txid
+    def __init__(self, txid: int | str | bytes, vout: int, scriptSig: bytes, sequence: int) -> None:
+        self.txid = hash2bytes(txid)
         self.vout = vout
         self.scriptSig = scriptSig
         self.sequence = sequence
 
     def serialize(self) -> bytes:
         ret = b''
-        tmp = self.txid
-        # 小端存放
-        for _ in range(8):
-            ret += struct.pack("<I", tmp & 0xFFFFFFFF)
-            tmp >>= 32
+        ret += self.txid
         ret += struct.pack('<I', self.vout)
         ret += ser_compact_size(len(self.scriptSig))
         ret += self.scriptSig
@@ -67,10 +63,7 @@ class TxIn:
 
     @classmethod
     def deserialize(cls, f) -> TxIn:
-        txid = 0
-        for i in range(8):
-            t = struct.unpack("<I", f.read(4))[0]
-            txid += t << (i * 32)
+        txid = f.read(32)
         vout = struct.unpack("<I", f.read(4))[0]
         scirptSig_len = deser_compact_size(f)
         scriptSig = f.read(scirptSig_len)
@@ -79,7 +72,7 @@ class TxIn:
 
     def to_dict(self) -> Dict:
         return {
-            'txid': int2hex(self.txid, 64),
+            'txid': hash2hex(self.txid),
             'vout': self.vout,
             'scriptSig': self.scriptSig.hex(),
             'sequence': int2hex(self.sequence, 8)
@@ -93,6 +86,7 @@ class TxOut:
         value: 交易额，以聪（satoshi）为单位
         scriptPubKey: bytes类型的脚本
     """
+    __slots__ = ('value', 'scriptPubKey')
 
     def __init__(self, value: int, scriptPubKey: bytes) -> None:
         self.value = value
@@ -129,6 +123,7 @@ class Transaction:
         locktime
         txid: 交易ID
     """
+    __slots__ = ('version', 'vin', 'vout', 'locktime')
 
     def __init__(self, version: int, vin: List[TxIn], vout: List[TxOut], locktime: int) -> None:
         self.version = version
@@ -164,11 +159,12 @@ class Transaction:
 
     @property
     def txid(self) -> str:
-        return double_sha256(self.serialize())[::-1].hex()
+        return hash2hex(double_sha256(self.serialize()))
 
-    def to_dict(self) -> Dict:
+    def to_dict(self, txid: str = None) -> Dict:
+        """txid为已经算好的交易ID，省略时重新计算"""
         return {
-            'hash': self.txid,
+            'hash': self.txid if txid is None else txid,
             'version': self.version,
             'vin': [i.to_dict() for i in self.vin],
             'vout': [i.to_dict() for i in self.vout],
@@ -179,7 +175,7 @@ class Transaction:
         """计算对应的sighash"""
         tmp = self.vin[input_index].scriptSig
         self.vin[input_index].scriptSig = make_P2PKH_scriptPubKey(
-            b58decode_check(account.address)[1:])
+            account.pubkey_hash)
         ret = double_sha256(self.serialize() + struct.pack(b"<I", 1))
         self.vin[input_index].scriptSig = tmp
         return ret
@@ -199,7 +195,7 @@ class Transaction:
             #   随机4bytes的vout
             #   空的脚本
             #   全F的sequence
-            txid = int.from_bytes(double_sha256(next(rs).encode()), 'big')
+            txid = double_sha256(next(rs).encode())
             _vout = random.randint(0, N_8F)
             vin.append(TxIn(txid, _vout, b'', N_8F))
         for i in range(n_vout):
@@ -207,9 +203,7 @@ class Transaction:
             #   随机交易额，限制在相对合理的范围内
             #   对应账户生成的pubkey脚本
             value = random.randint(1, N_8F)
-            # 需要去除开头的版本号0x00
-            pubkey_hash = b58decode_check(account_out[i].address)[1:]
-            scriptPubKey = make_P2PKH_scriptPubKey(pubkey_hash)
+            scriptPubKey = make_P2PKH_scriptPubKey(account_out[i].pubkey_hash)
             vout.append(TxOut(value, scriptPubKey))
 
         tx = cls(1, vin, vout, 0)
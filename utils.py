@@ -9,6 +9,12 @@ def double_sha256(x: bytes) -> bytes:
     return hashlib.sha256(hashlib.sha256(x).digest()).digest()
 
 
+def double_sha256_many(xs) -> list:
+    """批量两次SHA256哈希"""
+    sha256 = hashlib.sha256
+    return [sha256(sha256(x).digest()).digest() for x in xs]
+
+
 def ripemd160_sha256(x: bytes) -> bytes:
     """先SHA256后RIPEMD160"""
     return hashlib.new('ripemd160', hashlib.sha256(x).digest()).digest()